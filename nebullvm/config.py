@@ -3,7 +3,7 @@ import os
 LEARNER_METADATA_FILENAME = "metadata.json"
 NO_COMPILER_INSTALLATION = int(os.getenv("NO_COMPILER_INSTALLATION", "0")) > 0
 ONNX_OPSET_VERSION = 13
-NEBULLVM_DEBUG_FILE = "nebullvm_debug.json"
+NEBULLVM_DEBUG_FILE = "nebullvm_debug.jsonl"
 
 AUTO_TVM_TUNING_OPTION = {
     "tuner": "xgb",
@@ -25,12 +25,22 @@ NVIDIA_FILENAMES = {
 
 TVM_FILENAMES = {"engine": "compiled_lib.so"}
 
-ONNX_FILENAMES = {"model_name": "model.onnx"}
+ONNX_FILENAMES = {
+    "model_name": "model.onnx",
+    "quantized_model_suffix": "_int8.onnx",
+    "optimized_model_suffix": ".ort_optimized.onnx",
+}
+VNNI_CPU_FLAGS = ("avx512_vnni", "avx512vnni", "avx_vnni", "avxvnni")
 CUDA_PROVIDERS = [
     "TensorrtExecutionProvider",
     "CUDAExecutionProvider",
     "CPUExecutionProvider",
 ]
+INTEL_CPU_PROVIDERS = [
+    ("OpenVINOExecutionProvider", {"device_type": "CPU_FP32"}),
+    "DnnlExecutionProvider",
+    "CPUExecutionProvider",
+]
 
 OPENVINO_FILENAMES = {
     "metadata": LEARNER_METADATA_FILENAME,
@@ -1,17 +1,33 @@
+import hashlib
 import os
 import shutil
 import warnings
 from abc import ABC
+from functools import lru_cache
 from pathlib import Path
-from typing import Union, List, Generator, Tuple, Dict, Type
+from typing import (
+    Union,
+    List,
+    Tuple,
+    Dict,
+    Type,
+    Optional,
+    Sequence,
+)
+from weakref import WeakValueDictionary
 
-import cpuinfo
 import numpy as np
 import tensorflow as tf
 import torch
-
-from nebullvm.base import DeepLearningFramework, ModelParams
-from nebullvm.config import ONNX_FILENAMES, CUDA_PROVIDERS
+import torch.utils.dlpack
+
+from nebullvm.base import DeepLearningFramework, ModelParams, DynamicAxisInfo
+from nebullvm.config import (
+    ONNX_FILENAMES,
+    CUDA_PROVIDERS,
+    INTEL_CPU_PROVIDERS,
+    VNNI_CPU_FLAGS,
+)
 from nebullvm.inference_learners.base import (
     BaseInferenceLearner,
     LearnerMetadata,
@@ -19,6 +35,12 @@ from nebullvm.inference_learners.base import (
     TensorflowBaseInferenceLearner,
     NumpyBaseInferenceLearner,
 )
+from nebullvm.utils.general import (
+    get_cpu_brand,
+    get_cpu_flags,
+    get_physical_cpu_count,
+    gpu_is_available,
+)
 
 try:
     import onnxruntime as ort
@@ -31,28 +53,290 @@ except ImportError:
     install_onnxruntime()
     import onnxruntime as ort
 
+ORT_TYPES_TO_NUMPY = {
+    "tensor(float)": np.float32,
+    "tensor(float16)": np.float16,
+    "tensor(double)": np.float64,
+    "tensor(int64)": np.int64,
+    "tensor(int32)": np.int32,
+    "tensor(int16)": np.int16,
+    "tensor(int8)": np.int8,
+    "tensor(uint8)": np.uint8,
+    "tensor(bool)": np.bool_,
+}
+
+TORCH_TO_NUMPY_DTYPES = {
+    torch.float32: np.float32,
+    torch.float16: np.float16,
+    torch.float64: np.float64,
+    torch.int64: np.int64,
+    torch.int32: np.int32,
+    torch.int16: np.int16,
+    torch.int8: np.int8,
+    torch.uint8: np.uint8,
+    torch.bool: np.bool_,
+}
+NUMPY_TO_TORCH_DTYPES = {v: k for k, v in TORCH_TO_NUMPY_DTYPES.items()}
+
+# Providers whose optimized graphs can be serialized by onnxruntime: the
+# other ones compile the nodes they run.
+SERIALIZABLE_PROVIDERS = ("CPUExecutionProvider", "CUDAExecutionProvider")
+
+# Sessions are shared among learners running the same model file, and
+# released as soon as no learner uses them anymore.
+_SESSION_CACHE: "WeakValueDictionary[Tuple, ort.InferenceSession]" = (
+    WeakValueDictionary()
+)
+
 
+def _register_env_allocator() -> bool:
+    # A cpu arena registered on the onnxruntime environment is shared by
+    # all the sessions using the environment allocators.
+    try:
+        ort.create_and_register_allocator(
+            ort.OrtMemoryInfo(
+                "Cpu",
+                ort.OrtAllocatorType.ORT_ARENA_ALLOCATOR,
+                0,
+                ort.OrtMemType.DEFAULT,
+            ),
+            ort.OrtArenaCfg(0, -1, -1, -1),
+        )
+    except Exception as ex:
+        warnings.warn(
+            f"The shared onnxruntime cpu arena could not be registered. "
+            f"Got error {ex}. Each session will use its own arena."
+        )
+        return False
+    return True
+
+
+_ENV_ALLOCATOR_REGISTERED = _register_env_allocator()
+
+
+@lru_cache(maxsize=1)
 def _is_intel_cpu():
-    if torch.cuda.is_available():
+    if gpu_is_available():
         return False  # running on GPU
-    cpu_info = cpuinfo.get_cpu_info()["brand_raw"].lower()
-    if "intel" in cpu_info:
+    if "intel" in get_cpu_brand():
         return True
     return False
 
 
-def _get_ort_session_options() -> ort.SessionOptions:
+@lru_cache(maxsize=1)
+def _has_vnni_support() -> bool:
+    if gpu_is_available():
+        return False  # running on GPU
+    cpu_flags = get_cpu_flags()
+    return any(flag in cpu_flags for flag in VNNI_CPU_FLAGS)
+
+
+def _get_quantized_onnx_path(onnx_path: Union[str, Path]) -> Path:
+    onnx_path = Path(onnx_path)
+    return onnx_path.parent / (
+        f"{onnx_path.stem}{ONNX_FILENAMES['quantized_model_suffix']}"
+    )
+
+
+def _filter_available_providers(
+    providers: List[Union[str, Tuple[str, Dict]]]
+) -> List[Union[str, Tuple[str, Dict]]]:
+    available_providers = ort.get_available_providers()
+    return [
+        provider
+        for provider in providers
+        if (provider if isinstance(provider, str) else provider[0])
+        in available_providers
+    ]
+
+
+def _get_provider_names(
+    providers: Optional[List[Union[str, Tuple[str, Dict]]]]
+) -> List[str]:
+    if providers is None:
+        return ["CPUExecutionProvider"]
+    available_providers = ort.get_available_providers()
+    return [
+        provider_name
+        for provider_name in (
+            provider if isinstance(provider, str) else provider[0]
+            for provider in providers
+        )
+        if provider_name in available_providers
+    ]
+
+
+def _can_persist_optimized_model(
+    providers: Optional[List[Union[str, Tuple[str, Dict]]]]
+) -> bool:
+    return all(
+        provider_name in SERIALIZABLE_PROVIDERS
+        for provider_name in _get_provider_names(providers)
+    )
+
+
+def _get_optimized_onnx_path(
+    onnx_path: Union[str, Path],
+    providers: Optional[List[Union[str, Tuple[str, Dict]]]],
+) -> str:
+    # The optimized graph depends on the onnxruntime version, on the
+    # providers and on the cpu it has been produced for, so all of them are
+    # part of the file name.
+    fingerprint = hashlib.md5(
+        "|".join(
+            [
+                ort.__version__,
+                *_get_provider_names(providers),
+                get_cpu_brand(),
+                *sorted(get_cpu_flags()),
+            ]
+        ).encode()
+    ).hexdigest()[:8]
+    return (
+        f"{onnx_path}.{fingerprint}{ONNX_FILENAMES['optimized_model_suffix']}"
+    )
+
+
+def _is_optimized_model_valid(
+    onnx_path: Union[str, Path], optimized_onnx_path: Union[str, Path]
+) -> bool:
+    return os.path.exists(optimized_onnx_path) and os.path.getmtime(
+        optimized_onnx_path
+    ) >= os.path.getmtime(onnx_path)
+
+
+def _get_ort_session_options(
+    dynamic_shapes: bool = False,
+) -> ort.SessionOptions:
     sess_options = ort.SessionOptions()
     sess_options.graph_optimization_level = (
         ort.GraphOptimizationLevel.ORT_ENABLE_ALL
     )
-    if not torch.cuda.is_available():
+    # Memory patterns can be planned once only when input shapes are fixed.
+    sess_options.enable_mem_pattern = not dynamic_shapes
+    sess_options.enable_cpu_mem_arena = True
+    if _ENV_ALLOCATOR_REGISTERED:
+        sess_options.add_session_config_entry(
+            "session.use_env_allocators", "1"
+        )
+    if gpu_is_available():
+        sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    else:
         sess_options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
         sess_options.inter_op_num_threads = 1
-        sess_options.intra_op_num_threads = max(torch.get_num_threads(), 1)
+        # Using the logical cores would oversubscribe the physical ones.
+        sess_options.intra_op_num_threads = get_physical_cpu_count()
     return sess_options
 
 
+def _outputs_follow_inputs(dynamic_info: DynamicAxisInfo) -> bool:
+    # Dynamic output axes sharing their tag with an input axis can be sized
+    # from the inputs before running the model.
+    input_tags = {
+        tag
+        for input_axes in dynamic_info.inputs
+        for tag in input_axes.values()
+    }
+    return all(
+        tag in input_tags
+        for output_axes in dynamic_info.outputs
+        for tag in output_axes.values()
+    )
+
+
+def _prepare_input_tensor(
+    input_tensor: torch.Tensor, dtype: Optional[torch.dtype]
+) -> torch.Tensor:
+    # Inputs are given to onnxruntime as C-contiguous buffers with the dtype
+    # expected by the model, so that no conversion is needed at run time.
+    input_tensor = input_tensor.detach()
+    if dtype is not None:
+        input_tensor = input_tensor.to(dtype)
+    return input_tensor.contiguous()
+
+
+def _create_ort_session(
+    onnx_path: Union[str, Path],
+    sess_options: ort.SessionOptions,
+    providers: Optional[List[Union[str, Tuple[str, Dict]]]],
+) -> ort.InferenceSession:
+    return ort.InferenceSession(
+        str(onnx_path), sess_options=sess_options, providers=providers
+    )
+
+
+def _build_ort_session(
+    onnx_path: Union[str, Path],
+    sess_options: ort.SessionOptions,
+    providers: Optional[List[Union[str, Tuple[str, Dict]]]],
+) -> ort.InferenceSession:
+    # When the providers do not compile the graph nodes, the graph optimized
+    # by onnxruntime is stored next to the original model the first time the
+    # session is built and reused afterwards, skipping the graph
+    # optimization step.
+    if not _can_persist_optimized_model(providers):
+        return _create_ort_session(onnx_path, sess_options, providers)
+    optimized_onnx_path = _get_optimized_onnx_path(onnx_path, providers)
+    if _is_optimized_model_valid(onnx_path, optimized_onnx_path):
+        graph_optimization_level = sess_options.graph_optimization_level
+        sess_options.graph_optimization_level = (
+            ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        )
+        try:
+            return _create_ort_session(
+                optimized_onnx_path, sess_options, providers
+            )
+        except Exception as ex:
+            warnings.warn(
+                f"The onnxruntime optimized model {optimized_onnx_path} "
+                f"could not be loaded. Got error {ex}. The original "
+                f"model will be optimized again."
+            )
+            sess_options.graph_optimization_level = graph_optimization_level
+    if os.access(
+        os.path.dirname(os.path.abspath(optimized_onnx_path)), os.W_OK
+    ):
+        sess_options.optimized_model_filepath = optimized_onnx_path
+        try:
+            return _create_ort_session(onnx_path, sess_options, providers)
+        except Exception as ex:
+            warnings.warn(
+                f"The onnxruntime optimized model could not be stored in "
+                f"{optimized_onnx_path}. Got error {ex}."
+            )
+            sess_options.optimized_model_filepath = ""
+    return _create_ort_session(onnx_path, sess_options, providers)
+
+
+def _get_ort_session(
+    onnx_path: Union[str, Path],
+    sess_options: ort.SessionOptions,
+    providers: Optional[List[Union[str, Tuple[str, Dict]]]],
+) -> ort.InferenceSession:
+    # Sessions are keyed on the model given by the user and on the options
+    # set by the learner, the optimized graph being resolved only when the
+    # session is built. Config entries cannot be read back from the options,
+    # but they only depend on the hardware, which is the same for all the
+    # learners.
+    key = (
+        os.path.realpath(onnx_path),
+        os.path.getmtime(onnx_path),
+        tuple(str(provider) for provider in providers or ()),
+        int(sess_options.graph_optimization_level),
+        int(sess_options.execution_mode),
+        sess_options.enable_mem_pattern,
+        sess_options.enable_cpu_mem_arena,
+        sess_options.intra_op_num_threads,
+        sess_options.inter_op_num_threads,
+    )
+    ort_session = _SESSION_CACHE.get(key)
+    if ort_session is None:
+        ort_session = _SESSION_CACHE.setdefault(
+            key, _build_ort_session(onnx_path, sess_options, providers)
+        )
+    return ort_session
+
+
 class ONNXInferenceLearner(BaseInferenceLearner, ABC):
     """Model converted to ONNX and run with Microsoft's onnxruntime.
 
@@ -64,6 +348,10 @@ class ONNXInferenceLearner(BaseInferenceLearner, ABC):
             was produced.
         output_names (List[str]): Output names used when the onnx model
             was produced.
+        avx512_vnni (bool, optional): Flag for running the INT8 version of
+            the model stored next to `onnx_path` (if any), which exploits the
+            AVX-512 VNNI / AVX-VNNI instructions. If not given, it is
+            activated when the CPU supports VNNI.
     """
 
     def __init__(
@@ -71,35 +359,123 @@ class ONNXInferenceLearner(BaseInferenceLearner, ABC):
         onnx_path: Union[str, Path],
         input_names: List[str],
         output_names: List[str],
+        avx512_vnni: Optional[bool] = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
         self.onnx_path = onnx_path
-        sess_options = _get_ort_session_options()
+        if avx512_vnni is None:
+            avx512_vnni = _has_vnni_support()
+        quantized_onnx_path = _get_quantized_onnx_path(onnx_path)
+        # The flag reports whether the INT8 model is actually run.
+        self.avx512_vnni = bool(avx512_vnni) and quantized_onnx_path.exists()
+        sess_options = _get_ort_session_options(
+            dynamic_shapes=self.network_parameters.dynamic_info is not None
+        )
 
         if _is_intel_cpu():
             sess_options.add_session_config_entry(
                 "session.set_denormal_as_zero", "1"
             )
-            ort_session = ort.InferenceSession(onnx_path, sess_options)
+            # OpenVINO and oneDNN providers are used when installed, the
+            # default CPU provider is used for the unsupported nodes.
+            providers = _filter_available_providers(INTEL_CPU_PROVIDERS)
         else:
-            ort_session = ort.InferenceSession(
-                onnx_path,
-                sess_options=sess_options,
-                providers=CUDA_PROVIDERS
-                if torch.cuda.is_available()
-                else None,
+            providers = CUDA_PROVIDERS if gpu_is_available() else None
+        ort_session = None
+        if self.avx512_vnni:
+            try:
+                ort_session = _get_ort_session(
+                    quantized_onnx_path, sess_options, providers
+                )
+            except Exception as ex:
+                warnings.warn(
+                    f"The INT8 model {quantized_onnx_path} could not be "
+                    f"loaded. Got error {ex}. The FP32 model will be used."
+                )
+                self.avx512_vnni = False
+        if ort_session is None:
+            ort_session = _get_ort_session(
+                onnx_path, sess_options, providers
             )
         self._session = ort_session
         self.input_names = input_names
         self.output_names = output_names
-
-    def save(self, path: Union[str, Path], **kwargs):
+        self._input_names = tuple(input_names)
+        input_types = {
+            input_.name: input_.type for input_ in ort_session.get_inputs()
+        }
+        self._input_torch_dtypes = tuple(
+            NUMPY_TO_TORCH_DTYPES.get(
+                ORT_TYPES_TO_NUMPY.get(input_types.get(name))
+            )
+            for name in input_names
+        )
+        output_types = {
+            output.name: output.type for output in ort_session.get_outputs()
+        }
+        self._output_names = tuple(output_names)
+        self._output_dtypes = tuple(
+            ORT_TYPES_TO_NUMPY.get(output_types.get(name))
+            for name in output_names
+        )
+        self._output_torch_dtypes = tuple(
+            NUMPY_TO_TORCH_DTYPES.get(output_dtype)
+            for output_dtype in self._output_dtypes
+        )
+        # Buffers can be bound only for the types having a torch equivalent,
+        # the models using other types are run on numpy arrays.
+        self._io_binding_supported = all(
+            dtype is not None
+            for dtype in self._input_torch_dtypes + self._output_torch_dtypes
+        )
+        # Without dynamic axes the output shapes never change, so that the
+        # output buffers can be allocated before running the model.
+        self._static_output_shapes = (
+            [
+                (self.network_parameters.batch_size, *output_size)
+                for output_size in self.network_parameters.output_sizes
+            ]
+            if self.network_parameters.dynamic_info is None
+            else None
+        )
+        self._output_shapes_from_inputs = (
+            self.network_parameters.dynamic_info is not None
+            and _outputs_follow_inputs(self.network_parameters.dynamic_info)
+        )
+        self._warm_up()
+
+    def _warm_up(self):
+        # The first run triggers the kernels initialization and the memory
+        # arena growth: running it here keeps it out of the first prediction
+        # and of the latency measurements.
+        dummy_inputs = [
+            torch.zeros(
+                (self.network_parameters.batch_size, *input_info.size),
+                dtype=input_dtype or torch.float32,
+            )
+            for input_info, input_dtype in zip(
+                self.network_parameters.input_infos, self._input_torch_dtypes
+            )
+        ]
+        try:
+            self._predict_tensors(dummy_inputs)
+        except Exception as ex:
+            warnings.warn(f"The onnxruntime warm-up run failed. Got {ex}.")
+
+    def save(
+        self, path: Union[str, Path], avx512_vnni: bool = False, **kwargs
+    ):
         """Save the model.
 
         Args:
             path (Path or str): Path to the directory where the model will
                 be stored.
+            avx512_vnni (bool, optional): Flag for storing, next to the
+                original model, a version of it with the MatMul and Gemm
+                weights dynamically quantized to INT8. The quantized model
+                will be used at load time on CPUs supporting the VNNI
+                instructions. Default False.
             kwargs (Dict): Dictionary of key-value pairs that will be saved in
                 the model metadata file.
         """
@@ -111,18 +487,38 @@ class ONNXInferenceLearner(BaseInferenceLearner, ABC):
         )
         metadata.save(path)
 
-        shutil.copy(
-            self.onnx_path,
-            os.path.join(str(path), ONNX_FILENAMES["model_name"]),
-        )
+        onnx_path = os.path.join(str(path), ONNX_FILENAMES["model_name"])
+        shutil.copy(self.onnx_path, onnx_path)
+        if avx512_vnni:
+            # The quantization tools have extra dependencies, so they are
+            # imported only when needed.
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(
+                Path(self.onnx_path),
+                _get_quantized_onnx_path(onnx_path),
+                # Only the MatMul kernels run on VNNI, while int8 weights
+                # are not supported by the ConvInteger kernel of the CPU
+                # provider.
+                op_types_to_quantize=["MatMul", "Gemm"],
+                weight_type=QuantType.QInt8,
+            )
 
     @classmethod
-    def load(cls, path: Union[Path, str], **kwargs):
+    def load(
+        cls,
+        path: Union[Path, str],
+        avx512_vnni: Optional[bool] = None,
+        **kwargs,
+    ):
         """Load the model.
 
         Args:
             path (Path or str): Path to the directory where the model is
                 stored.
+            avx512_vnni (bool, optional): Flag for running the INT8 model
+                stored in `path`, if any. If not given, it is activated when
+                the CPU supports the VNNI instructions.
             kwargs (Dict): Dictionary of additional arguments for consistency
                 with other Learners.
 
@@ -142,15 +538,159 @@ class ONNXInferenceLearner(BaseInferenceLearner, ABC):
             onnx_path=onnx_path,
             input_names=metadata["input_names"],
             output_names=metadata["output_names"],
+            avx512_vnni=avx512_vnni,
         )
 
-    def _predict_arrays(self, input_arrays: Generator[np.ndarray, None, None]):
-        input_dict = {
-            name: input_array
-            for name, input_array in zip(self.input_names, input_arrays)
-        }
-        outputs = self._session.run(self.output_names, input_dict)
-        return outputs
+    def _check_inputs_number(self, inputs: Sequence):
+        if len(inputs) != len(self._input_names):
+            raise ValueError(
+                f"The model expects {len(self._input_names)} input tensors. "
+                f"Got {len(inputs)}."
+            )
+
+    def _predict_arrays(
+        self, input_arrays: Sequence[np.ndarray]
+    ) -> List[np.ndarray]:
+        self._check_inputs_number(input_arrays)
+        input_arrays = [
+            np.ascontiguousarray(input_array) for input_array in input_arrays
+        ]
+        if not self._io_binding_supported or any(
+            input_array.dtype.type not in NUMPY_TO_TORCH_DTYPES
+            for input_array in input_arrays
+        ):
+            return self._run_session(input_arrays)
+        # Arrays are viewed as torch tensors without copies, so that the
+        # outputs are written by onnxruntime directly in the returned arrays.
+        # Torch views only writeable arrays, the read-only ones are copied.
+        input_tensors = [
+            torch.from_numpy(
+                input_array
+                if input_array.flags.writeable
+                else input_array.copy()
+            )
+            for input_array in input_arrays
+        ]
+        return [
+            output_tensor.numpy()
+            for output_tensor in self._predict_tensors(input_tensors)
+        ]
+
+    def _get_output_shapes(
+        self, input_shapes: List[Tuple[int, ...]]
+    ) -> List[Tuple[int, ...]]:
+        dynamic_info = self.network_parameters.dynamic_info
+        return [
+            tuple(
+                x
+                if i not in dynamic_axis.keys()
+                else dynamic_info.retrieve_output_dim(input_shapes, j, i, x)
+                for i, x in enumerate(
+                    (self.network_parameters.batch_size, *output_size)
+                )
+            )
+            for j, (output_size, dynamic_axis) in enumerate(
+                zip(
+                    self.network_parameters.output_sizes,
+                    dynamic_info.outputs,
+                )
+            )
+        ]
+
+    def _run_session(
+        self, input_arrays: Sequence[np.ndarray]
+    ) -> List[np.ndarray]:
+        return self._session.run(
+            self._output_names, dict(zip(self._input_names, input_arrays))
+        )
+
+    def _predict_tensors(
+        self, input_tensors: Sequence[torch.Tensor]
+    ) -> List[torch.Tensor]:
+        self._check_inputs_number(input_tensors)
+        if not self._io_binding_supported:
+            device = input_tensors[0].device
+            output_arrays = self._run_session(
+                [
+                    input_tensor.detach().cpu().numpy()
+                    for input_tensor in input_tensors
+                ]
+            )
+            return [
+                torch.from_numpy(output_array).to(device)
+                for output_array in output_arrays
+            ]
+        # A new binding is created at each call, so that concurrent
+        # predictions on the same learner never share their buffers.
+        io_binding = self._session.io_binding()
+        input_tensors = [
+            _prepare_input_tensor(input_tensor, input_dtype)
+            for input_tensor, input_dtype in zip(
+                input_tensors, self._input_torch_dtypes
+            )
+        ]
+        output_shapes = self._static_output_shapes
+        if self._output_shapes_from_inputs:
+            output_shapes = self._get_output_shapes(
+                [tuple(input_tensor.size()) for input_tensor in input_tensors]
+            )
+        device = input_tensors[0].device
+        device_type = "cuda" if device.type == "cuda" else "cpu"
+        device_id = device.index or 0
+        # Torch buffers are bound directly to onnxruntime, avoiding numpy
+        # conversions and host round-trips for tensors living on the GPU.
+        for input_name, input_tensor in zip(self._input_names, input_tensors):
+            io_binding.bind_input(
+                name=input_name,
+                device_type="cuda" if input_tensor.is_cuda else "cpu",
+                device_id=input_tensor.device.index or 0,
+                element_type=TORCH_TO_NUMPY_DTYPES[input_tensor.dtype],
+                shape=tuple(input_tensor.size()),
+                buffer_ptr=input_tensor.data_ptr(),
+            )
+        if output_shapes is not None:
+            output_tensors = [
+                torch.empty(output_shape, dtype=output_dtype, device=device)
+                for output_shape, output_dtype in zip(
+                    output_shapes, self._output_torch_dtypes
+                )
+            ]
+            for output_name, output_dtype, output_shape, output_tensor in zip(
+                self._output_names,
+                self._output_dtypes,
+                output_shapes,
+                output_tensors,
+            ):
+                io_binding.bind_output(
+                    name=output_name,
+                    device_type=device_type,
+                    device_id=device_id,
+                    element_type=output_dtype,
+                    shape=output_shape,
+                    buffer_ptr=output_tensor.data_ptr(),
+                )
+        else:
+            # Some output dims are not tied to the input ones, so the
+            # outputs are allocated by onnxruntime and copied back.
+            for output_name in self._output_names:
+                io_binding.bind_output(
+                    name=output_name,
+                    device_type=device_type,
+                    device_id=device_id,
+                )
+        if device_type == "cuda":
+            # Kernels writing the inputs on torch's stream must be completed
+            # before onnxruntime reads them.
+            torch.cuda.current_stream(device).synchronize()
+        io_binding.synchronize_inputs()
+        self._session.run_with_iobinding(io_binding)
+        io_binding.synchronize_outputs()
+        if output_shapes is None:
+            output_tensors = [
+                torch.from_numpy(output_array).to(device)
+                for output_array in io_binding.copy_outputs_to_cpu()
+            ]
+        return output_tensors
 
 
 class PytorchONNXInferenceLearner(
@@ -186,12 +726,7 @@ class PytorchONNXInferenceLearner(
                 1 to 1 mapping. In fact the output tensors are produced as the
                 multiple-output of the model given a (multi-) tensor input.
         """
-        input_arrays = (
-            input_tensor.cpu().detach().numpy()
-            for input_tensor in input_tensors
-        )
-        outputs = self._predict_arrays(input_arrays)
-        return tuple(torch.from_numpy(output) for output in outputs)
+        return tuple(self._predict_tensors(input_tensors))
 
 
 class TensorflowONNXInferenceLearner(
@@ -227,10 +762,22 @@ class TensorflowONNXInferenceLearner(
                 1 to 1 mapping. In fact the output tensors are produced as the
                 multiple-output of the model given a (multi-) tensor input.
         """
-        input_arrays = (input_tensor.numpy() for input_tensor in input_tensors)
-        outputs = self._predict_arrays(input_arrays)
+        # Tensors are exchanged with torch through DLPack, which shares the
+        # memory, so that the buffers can be directly bound to onnxruntime.
+        input_tensors = [
+            torch.utils.dlpack.from_dlpack(
+                tf.experimental.dlpack.to_dlpack(input_tensor)
+            )
+            for input_tensor in input_tensors
+        ]
+        outputs = self._predict_tensors(input_tensors)
         # noinspection PyTypeChecker
-        return tuple(tf.convert_to_tensor(output) for output in outputs)
+        return tuple(
+            tf.experimental.dlpack.from_dlpack(
+                torch.utils.dlpack.to_dlpack(output)
+            )
+            for output in outputs
+        )
 
 
 class NumpyONNXInferenceLearner(
@@ -266,8 +813,7 @@ class NumpyONNXInferenceLearner(
                 1 to 1 mapping. In fact the output tensors are produced as the
                 multiple-output of the model given a (multi-) tensor input.
         """
-        input_arrays = (input_tensor for input_tensor in input_tensors)
-        outputs = self._predict_arrays(input_arrays)
+        outputs = self._predict_arrays(input_tensors)
         return tuple(outputs)
 
 
@@ -67,7 +67,9 @@ def compute_tf_latency(
 
 
 def compute_optimized_running_time(
-    optimized_model: BaseInferenceLearner, steps: int = 100
+    optimized_model: BaseInferenceLearner,
+    steps: int = 100,
+    model_inputs: Tuple = None,
 ) -> float:
     """Compute the running time of the optimized model.
 
@@ -75,11 +77,14 @@ def compute_optimized_running_time(
         optimized_model (BaseInferenceLearner): Optimized model.
         steps (int): Number of times the experiment needs to be performed for
             computing the statistics.
+        model_inputs (Tuple, optional): Inputs used for running the model.
+            If not given, an input example is generated from the model.
 
     Returns:
         Float: Average latency.
     """
-    model_inputs = optimized_model.get_inputs_example()
+    if model_inputs is None:
+        model_inputs = optimized_model.get_inputs_example()
     latencies = []
     for _ in range(steps):
         starting_time = time.time()
@@ -1,14 +1,13 @@
 import json
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from logging import Logger
 from pathlib import Path
-from typing import Dict, Type, Tuple, Callable, List
+from typing import Dict, Type, Tuple, Callable, List, Optional
 import uuid
 
-import cpuinfo
 import numpy as np
-import torch
-
 
 from nebullvm.base import ModelCompiler, DeepLearningFramework, ModelParams
 from nebullvm.config import NEBULLVM_DEBUG_FILE
@@ -21,6 +20,10 @@ from nebullvm.optimizers import (
     OpenVinoOptimizer,
     ONNXOptimizer,
 )
+from nebullvm.utils.general import get_cpu_brand, gpu_is_available
+from nebullvm.utils.onnx import create_model_inputs_onnx
+from nebullvm.utils.tf import create_model_inputs_tf
+from nebullvm.utils.torch import create_model_inputs_torch
 
 COMPILER_TO_OPTIMIZER_MAP: Dict[ModelCompiler, Type[BaseOptimizer]] = {
     ModelCompiler.APACHE_TVM: ApacheTVMOptimizer,
@@ -29,6 +32,20 @@ COMPILER_TO_OPTIMIZER_MAP: Dict[ModelCompiler, Type[BaseOptimizer]] = {
     ModelCompiler.ONNX_RUNTIME: ONNXOptimizer,
 }
 
+# Optimizers whose compilation does not run benchmarks on the hardware, so
+# that they can compile concurrently without altering each other. TVM
+# autotuning and TensorRT tactic selection time the kernels while compiling.
+CONCURRENT_OPTIMIZERS: Tuple[Type[BaseOptimizer], ...] = (
+    ONNXOptimizer,
+    OpenVinoOptimizer,
+)
+
+MODEL_INPUTS_BUILDERS: Dict[DeepLearningFramework, Callable] = {
+    DeepLearningFramework.PYTORCH: create_model_inputs_torch,
+    DeepLearningFramework.TENSORFLOW: create_model_inputs_tf,
+    DeepLearningFramework.NUMPY: create_model_inputs_onnx,
+}
+
 
 def _tvm_is_available() -> bool:
     try:
@@ -43,63 +60,114 @@ def select_compilers_from_hardware():
     compilers = [ModelCompiler.ONNX_RUNTIME]
     if _tvm_is_available():
         compilers.append(ModelCompiler.APACHE_TVM)
-    if torch.cuda.is_available():
+    if gpu_is_available():
         compilers.append(ModelCompiler.TENSOR_RT)
-    cpu_raw_info = cpuinfo.get_cpu_info()["brand_raw"].lower()
-    if "intel" in cpu_raw_info:
+    if "intel" in get_cpu_brand():
         compilers.append(ModelCompiler.OPENVINO)
     return compilers
 
 
-def _optimize_with_compiler(
-    compiler: ModelCompiler,
-    logger: Logger,
-    metric_func: Callable = None,
-    **kwargs,
-) -> Tuple[BaseInferenceLearner, float]:
-    optimizer = COMPILER_TO_OPTIMIZER_MAP[compiler](logger)
-    return _optimize_with_optimizer(optimizer, logger, metric_func, **kwargs)
+def _save_info(optimizer: BaseOptimizer, score: float, debug_file: str):
+    # Each score is appended as a single json line, so that the file never
+    # needs to be read and rewritten.
+    with open(debug_file, "a", buffering=1) as f:
+        f.write(json.dumps({optimizer.__class__.__name__: f"{score}"}) + "\n")
 
 
-def _save_info(optimizer: BaseOptimizer, score: float, debug_file: str):
+def _load_debug(debug_file: str) -> Dict[str, str]:
+    debug_info = {}
     if Path(debug_file).exists():
         with open(debug_file, "r") as f:
-            old_dict = json.load(f)
+            for line in f:
+                if line.strip():
+                    debug_info.update(json.loads(line))
+    return debug_info
+
+
+def _log_failure(optimizer: BaseOptimizer, logger: Logger, ex: Exception):
+    warning_msg = (
+        f"Compilation failed with {optimizer.__class__.__name__}. "
+        f"Got error {ex}. The optimizer will be skipped."
+    )
+    if logger is None:
+        warnings.warn(warning_msg)
     else:
-        old_dict = {}
-    old_dict[optimizer.__class__.__name__] = f"{score}"
-    with open(debug_file, "w") as f:
-        json.dump(old_dict, f)
+        logger.warning(warning_msg)
+
 
+def _compile_with_optimizer(
+    optimizer: BaseOptimizer, **kwargs
+) -> Tuple[Optional[BaseInferenceLearner], Optional[Exception]]:
+    try:
+        return optimizer.optimize(**kwargs), None
+    except Exception as ex:
+        return None, ex
 
-def _optimize_with_optimizer(
+
+def _score_optimized_model(
     optimizer: BaseOptimizer,
+    model_optimized: Optional[BaseInferenceLearner],
     logger: Logger,
     metric_func: Callable = None,
     debug_file: str = None,
-    **kwargs,
 ) -> Tuple[BaseInferenceLearner, float]:
     if metric_func is None:
         metric_func = compute_optimized_running_time
-    try:
-        model_optimized = optimizer.optimize(**kwargs)
-        latency = metric_func(model_optimized)
-    except Exception as ex:
-        warning_msg = (
-            f"Compilation failed with {optimizer.__class__.__name__}. "
-            f"Got error {ex}. The optimizer will be skipped."
-        )
-        if logger is None:
-            warnings.warn(warning_msg)
-        else:
-            logger.warning(warning_msg)
-        latency = np.inf
-        model_optimized = None
+    latency = np.inf
+    if model_optimized is not None:
+        try:
+            latency = metric_func(model_optimized)
+        except Exception as ex:
+            _log_failure(optimizer, logger, ex)
+            model_optimized = None
     if debug_file:
         _save_info(optimizer, latency, debug_file)
     return model_optimized, latency
 
 
+def _optimize_with_optimizers(
+    optimizers: List[BaseOptimizer],
+    logger: Logger,
+    metric_func: Callable = None,
+    debug_file: str = None,
+    **kwargs,
+) -> List[Tuple[BaseInferenceLearner, float]]:
+    # Compilations of the concurrent optimizers run in threads, since the
+    # optimized models cannot be pickled. The other compilations, as well as
+    # the scores, are computed sequentially for not perturbing the timings.
+    concurrent_indexes = [
+        i
+        for i, op in enumerate(optimizers)
+        if type(op) in CONCURRENT_OPTIMIZERS
+    ]
+    compiled_models = [None] * len(optimizers)
+    if len(concurrent_indexes) > 0:
+        with ThreadPoolExecutor(
+            max_workers=len(concurrent_indexes)
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _compile_with_optimizer, optimizers[i], **kwargs
+                )
+                for i in concurrent_indexes
+            ]
+            for i, future in zip(concurrent_indexes, futures):
+                compiled_models[i] = future.result()
+    for i, op in enumerate(optimizers):
+        if i not in concurrent_indexes:
+            compiled_models[i] = _compile_with_optimizer(op, **kwargs)
+    optimized_models = []
+    for op, (model_optimized, ex) in zip(optimizers, compiled_models):
+        if ex is not None:
+            _log_failure(op, logger, ex)
+        optimized_models.append(
+            _score_optimized_model(
+                op, model_optimized, logger, metric_func, debug_file
+            )
+        )
+    return optimized_models
+
+
 class MultiCompilerOptimizer(BaseOptimizer):
     """Run all the optimizers available for the given hardware and select the
     best optimized model in terms of either latency or user defined
@@ -117,7 +185,7 @@ class MultiCompilerOptimizer(BaseOptimizer):
             `MultiCompilerOptimizer`.
         debug_mode (bool, optional): Boolean flag for activating the debug
             mode. When activated, all the performances of the the different
-            containers  will be stored in a json file saved in the working
+            containers  will be stored in a jsonl file saved in the working
             directory. Default is False.
     """
 
@@ -139,6 +207,15 @@ class MultiCompilerOptimizer(BaseOptimizer):
             f"{uuid.uuid4()}_{NEBULLVM_DEBUG_FILE}" if debug_mode else None
         )
 
+    def _get_optimizers(self) -> List[BaseOptimizer]:
+        optimizers = [
+            COMPILER_TO_OPTIMIZER_MAP[compiler](self.logger)
+            for compiler in self.compilers
+        ]
+        if self.extra_optimizers is not None:
+            optimizers += self.extra_optimizers
+        return optimizers
+
     def optimize(
         self,
         onnx_model: str,
@@ -156,31 +233,25 @@ class MultiCompilerOptimizer(BaseOptimizer):
         Returns:
             BaseInferenceLearner: Model optimized for inference.
         """
-        optimized_models = [
-            _optimize_with_compiler(
-                compiler,
-                logger=self.logger,
-                onnx_model=onnx_model,
-                output_library=output_library,
-                model_params=model_params,
-                debug_file=self.debug_file,
+        # All the compiled models are benchmarked on the same inputs.
+        model_inputs = tuple(
+            MODEL_INPUTS_BUILDERS[output_library](
+                batch_size=model_params.batch_size,
+                input_infos=model_params.input_infos,
             )
-            for compiler in self.compilers
-        ]
-        if self.extra_optimizers is not None:
-            optimized_models += [
-                _optimize_with_optimizer(
-                    op,
-                    logger=self.logger,
-                    onnx_model=onnx_model,
-                    output_library=output_library,
-                    model_params=model_params,
-                    debug_file=self.debug_file,
-                )
-                for op in self.extra_optimizers
-            ]
-        optimized_models.sort(key=lambda x: x[1], reverse=False)
-        return optimized_models[0][0]
+        )
+        optimized_models = _optimize_with_optimizers(
+            self._get_optimizers(),
+            metric_func=partial(
+                compute_optimized_running_time, model_inputs=model_inputs
+            ),
+            logger=self.logger,
+            onnx_model=onnx_model,
+            output_library=output_library,
+            model_params=model_params,
+            debug_file=self.debug_file,
+        )
+        return min(optimized_models, key=lambda x: x[1])[0]
 
     def optimize_on_custom_metric(
         self,
@@ -213,34 +284,25 @@ class MultiCompilerOptimizer(BaseOptimizer):
                 `return_all` is `False` or all the compiled models and their
                 scores otherwise.
         """
-        optimized_models = [
-            _optimize_with_compiler(
-                compiler,
-                metric_func=metric_func,
-                logger=self.logger,
-                onnx_model=onnx_model,
-                output_library=output_library,
-                model_params=model_params,
-                debug_mode=self.debug_mode,
-            )
-            for compiler in self.compilers
-        ]
-        if self.extra_optimizers is not None:
-            optimized_models += [
-                _optimize_with_optimizer(
-                    op,
-                    logger=self.logger,
-                    onnx_model=onnx_model,
-                    output_library=output_library,
-                    model_params=model_params,
-                    debug_mode=self.debug_mode,
-                )
-                for op in self.extra_optimizers
-            ]
+        optimized_models = _optimize_with_optimizers(
+            self._get_optimizers(),
+            metric_func=metric_func,
+            logger=self.logger,
+            onnx_model=onnx_model,
+            output_library=output_library,
+            model_params=model_params,
+            debug_file=self.debug_file,
+        )
         if return_all:
             return optimized_models
-        optimized_models.sort(key=lambda x: x[1], reverse=False)
-        return optimized_models[0][0]
+        return min(optimized_models, key=lambda x: x[1])[0]
+
+    @property
+    def debug_info(self) -> Optional[Dict[str, str]]:
+        """Scores obtained by each optimizer, if the debug mode is active."""
+        if self.debug_file is None:
+            return None
+        return _load_debug(self.debug_file)
 
     @property
     def usable(self) -> bool:
@@ -0,0 +1,35 @@
+import os
+from tempfile import TemporaryDirectory
+
+from nebullvm.base import DeepLearningFramework, ModelCompiler
+from nebullvm.inference_learners.onnx import ONNX_INFERENCE_LEARNERS
+from nebullvm.measure import compute_optimized_running_time
+from nebullvm.optimizers.multi_compiler import MultiCompilerOptimizer
+from nebullvm.optimizers.tests.utils import get_onnx_model
+
+
+def test_optimize_on_custom_metric_debug_mode():
+    output_library = DeepLearningFramework.PYTORCH
+    with TemporaryDirectory() as tmp_dir:
+        model_path, model_params = get_onnx_model(tmp_dir)
+        optimizer = MultiCompilerOptimizer(
+            ignore_compilers=[
+                compiler
+                for compiler in ModelCompiler
+                if compiler is not ModelCompiler.ONNX_RUNTIME
+            ],
+            debug_mode=True,
+        )
+        assert optimizer.debug_file is not None
+        try:
+            model = optimizer.optimize_on_custom_metric(
+                compute_optimized_running_time,
+                model_path,
+                output_library,
+                model_params,
+            )
+            assert isinstance(model, ONNX_INFERENCE_LEARNERS[output_library])
+            assert "ONNXOptimizer" in optimizer.debug_info
+        finally:
+            if os.path.exists(optimizer.debug_file):
+                os.remove(optimizer.debug_file)
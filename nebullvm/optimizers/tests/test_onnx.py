@@ -1,11 +1,24 @@
+import os
+import warnings
 from tempfile import TemporaryDirectory
 
+import numpy as np
 import pytest
 
 from nebullvm.base import DeepLearningFramework
-from nebullvm.inference_learners.onnx import ONNX_INFERENCE_LEARNERS
+from nebullvm.config import ONNX_FILENAMES
+from nebullvm.inference_learners.onnx import (
+    ONNX_INFERENCE_LEARNERS,
+    _build_ort_session,
+    _get_optimized_onnx_path,
+    _get_ort_session,
+    _get_ort_session_options,
+    ort,
+)
 from nebullvm.optimizers.onnx import ONNXOptimizer
-from nebullvm.optimizers.tests.utils import get_onnx_model
+from nebullvm.optimizers.tests.utils import get_onnx_model, OUTPUT_SHAPE
+
+QUANTIZED_SUFFIX = ONNX_FILENAMES["quantized_model_suffix"]
 
 
 @pytest.mark.parametrize(
@@ -13,6 +26,10 @@ from nebullvm.optimizers.tests.utils import get_onnx_model
     [
         (DeepLearningFramework.PYTORCH, True),
         (DeepLearningFramework.PYTORCH, False),
+        (DeepLearningFramework.TENSORFLOW, True),
+        (DeepLearningFramework.TENSORFLOW, False),
+        (DeepLearningFramework.NUMPY, True),
+        (DeepLearningFramework.NUMPY, False),
     ],
 )
 def test_onnxruntime(output_library: DeepLearningFramework, dynamic: bool):
@@ -25,6 +42,8 @@ def test_onnxruntime(output_library: DeepLearningFramework, dynamic: bool):
         inputs_example = list(model.get_inputs_example())
         res = model.predict(*inputs_example)
         assert res is not None
+        batch_size = len(inputs_example[0])
+        assert tuple(res[0].shape) == (batch_size, *OUTPUT_SHAPE)
 
         if dynamic:  # Check also with a smaller bath_size
             inputs_example = [
@@ -32,3 +51,128 @@ def test_onnxruntime(output_library: DeepLearningFramework, dynamic: bool):
             ]
             res = model.predict(*inputs_example)
             assert res is not None
+            assert tuple(res[0].shape) == (batch_size // 2, *OUTPUT_SHAPE)
+
+
+def test_onnxruntime_int8_save_and_load():
+    output_library = DeepLearningFramework.PYTORCH
+    with TemporaryDirectory() as tmp_dir:
+        model_path, model_params = get_onnx_model(tmp_dir)
+        model = ONNXOptimizer().optimize(
+            model_path, output_library, model_params
+        )
+        save_dir = os.path.join(tmp_dir, "saved_model")
+        os.makedirs(save_dir)
+        model.save(save_dir, avx512_vnni=True)
+        assert os.path.exists(
+            os.path.join(save_dir, f"model{QUANTIZED_SUFFIX}")
+        )
+
+        learner_class = ONNX_INFERENCE_LEARNERS[output_library]
+        loaded_model = learner_class.load(save_dir, avx512_vnni=True)
+        assert loaded_model.avx512_vnni
+        res = loaded_model.predict(*loaded_model.get_inputs_example())
+        assert tuple(res[0].shape) == (model_params.batch_size, *OUTPUT_SHAPE)
+
+        loaded_model = learner_class.load(save_dir, avx512_vnni=False)
+        assert not loaded_model.avx512_vnni
+
+
+def test_onnxruntime_dynamic_outputs_not_following_inputs():
+    output_library = DeepLearningFramework.PYTORCH
+    with TemporaryDirectory() as tmp_dir:
+        model_path, model_params = get_onnx_model(tmp_dir, dynamic=True)
+        # The output batch axis is not tied to the input ones, so the outputs
+        # must be allocated by onnxruntime.
+        model_params.dynamic_info.outputs = [{0: "output_batch_size"}]
+        model = ONNXOptimizer().optimize(
+            model_path, output_library, model_params
+        )
+        inputs_example = [
+            input_[: len(input_) // 2]
+            for input_ in model.get_inputs_example()
+        ]
+        res = model.predict(*inputs_example)
+        assert tuple(res[0].shape) == (len(inputs_example[0]), *OUTPUT_SHAPE)
+
+
+def test_onnxruntime_session_sharing():
+    output_library = DeepLearningFramework.PYTORCH
+    with TemporaryDirectory() as tmp_dir:
+        model_path, model_params = get_onnx_model(tmp_dir)
+        optimizer = ONNXOptimizer()
+        model = optimizer.optimize(model_path, output_library, model_params)
+        same_model = optimizer.optimize(
+            model_path, output_library, model_params
+        )
+        assert model._session is same_model._session
+
+        session = _get_ort_session(
+            model_path, _get_ort_session_options(dynamic_shapes=False), None
+        )
+        assert session is _get_ort_session(
+            model_path, _get_ort_session_options(dynamic_shapes=False), None
+        )
+        assert session is not _get_ort_session(
+            model_path, _get_ort_session_options(dynamic_shapes=True), None
+        )
+
+
+def test_onnxruntime_optimized_model_reuse():
+    with TemporaryDirectory() as tmp_dir:
+        model_path, _ = get_onnx_model(tmp_dir)
+        optimized_path = _get_optimized_onnx_path(model_path, None)
+        _build_ort_session(model_path, _get_ort_session_options(), None)
+        assert os.path.exists(optimized_path)
+
+        # The second session is built from the optimized graph.
+        sess_options = _get_ort_session_options()
+        _build_ort_session(model_path, sess_options, None)
+        assert (
+            sess_options.graph_optimization_level
+            == ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        )
+
+
+def test_onnxruntime_corrupted_optimized_model():
+    with TemporaryDirectory() as tmp_dir:
+        model_path, _ = get_onnx_model(tmp_dir)
+        optimized_path = _get_optimized_onnx_path(model_path, None)
+        with open(optimized_path, "wb") as f:
+            f.write(b"not an onnx model")
+        with pytest.warns(UserWarning):
+            session = _build_ort_session(
+                model_path, _get_ort_session_options(), None
+            )
+        assert session is not None
+
+
+def test_onnxruntime_optimized_model_read_only_dir(monkeypatch):
+    with TemporaryDirectory() as tmp_dir:
+        model_path, _ = get_onnx_model(tmp_dir)
+        # Checking the access rights is more reliable than making the
+        # directory read-only, which is ignored when running as root.
+        monkeypatch.setattr(os, "access", lambda *args, **kwargs: False)
+        session = _build_ort_session(
+            model_path, _get_ort_session_options(), None
+        )
+        assert session is not None
+        assert not os.path.exists(_get_optimized_onnx_path(model_path, None))
+
+
+def test_onnxruntime_numpy_read_only_inputs():
+    output_library = DeepLearningFramework.NUMPY
+    with TemporaryDirectory() as tmp_dir:
+        model_path, model_params = get_onnx_model(tmp_dir)
+        model = ONNXOptimizer().optimize(
+            model_path, output_library, model_params
+        )
+        inputs_example = [
+            np.array(input_) for input_ in model.get_inputs_example()
+        ]
+        for input_ in inputs_example:
+            input_.setflags(write=False)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            res = model.predict(*inputs_example)
+        assert tuple(res[0].shape) == (model_params.batch_size, *OUTPUT_SHAPE)
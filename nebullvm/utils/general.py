@@ -0,0 +1,40 @@
+import os
+from functools import lru_cache
+from typing import Dict, List
+
+import cpuinfo
+import psutil
+import torch
+
+
+@lru_cache(maxsize=1)
+def get_cpu_info() -> Dict:
+    """Get the cpu information.
+
+    `cpuinfo.get_cpu_info` can spawn a subprocess and take hundreds of
+    milliseconds, so its result is computed just once and then reused.
+    """
+    return cpuinfo.get_cpu_info()
+
+
+def get_cpu_brand() -> str:
+    return get_cpu_info()["brand_raw"].lower()
+
+
+def get_cpu_flags() -> List[str]:
+    return get_cpu_info().get("flags", [])
+
+
+@lru_cache(maxsize=1)
+def gpu_is_available() -> bool:
+    return torch.cuda.is_available()
+
+
+@lru_cache(maxsize=1)
+def get_physical_cpu_count() -> int:
+    """Get the number of physical cores.
+
+    The logical cores count is returned when the physical one cannot be
+    determined.
+    """
+    return psutil.cpu_count(logical=False) or os.cpu_count() or 1
@@ -4,6 +4,7 @@ from setuptools import setup, find_packages
 REQUIREMENTS = [
     "numpy>=1.19.0",
     "onnx>=1.10.0",
+    "psutil>=5.0.0",
     "py-cpuinfo>=8.0.0",
     "torch>=1.10.0",
 ]